@@ -1,13 +1,50 @@
+import io
+import itertools
 import os
+import sys
 import requests
 import csv
+import functools
+import hashlib
+import jellyfish
+import orjson
 import threading
 import time
-from flask import Flask, render_template_string, request, redirect, url_for, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, request, redirect, url_for, jsonify
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 
+
+class OrjsonProvider(JSONProvider):
+    """Route Flask's JSON handling (jsonify, request.get_json) through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # orjson already produces UTF-8 bytes: hand them over without a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Allow requests from anywhere (for dev; restrict in prod if desired)
+# Pages are never cached, so every hit re-sends the full HTML: at least make it small
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_MIN_SIZE"] = 512
+Compress(app)
+# The only input is one short search field: refuse oversized request bodies outright
+app.config["MAX_CONTENT_LENGTH"] = 16 * 1024
 
 # CSV URLs are configurable via environment variables (fallbacks use your provided links)
 CSV_URL_PHONE = os.getenv(
@@ -19,28 +56,181 @@ CSV_URL_NAME = os.getenv(
     "https://docs.google.com/spreadsheets/d/e/2PACX-1vR1l2CD7aX4_5qHwkQRRHD3ntTyOTOSfB-1jAsBP9J_TdSkyQGdc8qCjO1-GOgXysUdvkG6HQ4LuCov/pub?gid=752823035&single=true&output=csv"
 )
 
-# In-memory indexes for phone CSV
-fraud_list_phone = []
-phone_entries = {}          # normalized_phone -> [list of entries]
-customer_id_to_phone = {}   # customer_id -> normalized_phone
-zone_entries_phone = {}     # normalized_zone -> [list of entries]
+# Shared HTTP session: keeps the TLS connection to Google Docs alive across refreshes.
+# Two host pools (docs.google.com and the googleusercontent.com host it redirects to),
+# two connections each: one per concurrent CSV download.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=2, pool_maxsize=2, max_retries=Retry(total=2, backoff_factor=0.3)),
+)
 
-# In-memory indexes for name CSV
-fraud_list_name = []
-name_entries = {}           # normalized_name -> [list of entries]
-customer_id_to_name = {}    # customer_id -> normalized_name
-zone_entries_name = {}      # normalized_zone -> [list of entries]
+# HTTP validators (ETag, Last-Modified) and body digest from the last successful fetch of each CSV URL
+_csv_validators = {}
 
-data_lock = threading.Lock()
+
+class _HashingReader(io.RawIOBase):
+    """
+    Byte stream over an iterator of chunks (response.iter_content) that digests
+    everything passing through. A chunk bigger than the caller's buffer is handed
+    out over several reads.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+        self.digest = hashlib.blake2b(digest_size=16)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0  # EOF
+            self.digest.update(chunk)
+            self._pending = memoryview(chunk)
+        b = memoryview(b).cast("B")
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+class PhoneEntry:
+    """One row of the phone CSV."""
+    __slots__ = (
+        'phone_raw', 'phone_key', 'state', 'city', 'zone', 'customer_ids',
+        'customer_ids_set', 'distinct_count',
+    )
+
+    def __init__(self, phone_raw, phone_key, state, city, zone, customer_ids):
+        self.phone_raw = phone_raw
+        self.phone_key = phone_key
+        self.state = state
+        self.city = city
+        self.zone = zone
+        self.customer_ids = customer_ids
+        # Precomputed once at ingest: O(1) membership tests and no per-query set building
+        self.customer_ids_set = frozenset(customer_ids)
+        self.distinct_count = len(self.customer_ids_set)
+
+
+class NameEntry:
+    """One row of the name CSV."""
+    __slots__ = (
+        'name_raw', 'name_key', 'state', 'city', 'zone', 'customer_ids',
+        'customer_ids_set', 'distinct_count',
+    )
+
+    def __init__(self, name_raw, name_key, state, city, zone, customer_ids):
+        self.name_raw = name_raw
+        self.name_key = name_key
+        self.state = state
+        self.city = city
+        self.zone = zone
+        self.customer_ids = customer_ids
+        # Precomputed once at ingest: O(1) membership tests and no per-query set building
+        self.customer_ids_set = frozenset(customer_ids)
+        self.distinct_count = len(self.customer_ids_set)
+
+
+@dataclass(frozen=True)
+class Indexes:
+    """
+    Immutable snapshot of all in-memory indexes.
+    A refresh builds a brand-new instance and publishes it by rebinding INDEXES;
+    readers grab the reference once and never need a lock.
+    """
+    __slots__ = (
+        'phone_entries', 'customer_id_to_phone', 'zone_entries_phone',
+        'name_entries', 'customer_id_to_name', 'zone_entries_name',
+        'fraud_list_phone', 'fraud_list_name',
+        'cid_to_phone_entries', 'cid_to_name_entries',
+        'lookup_phone', 'lookup_raw', 'lookup_name', 'name_phonetic', 'locations', 'generation',
+    )
+
+    # Phone CSV
+    phone_entries: dict         # normalized_phone -> (tuple of entries)
+    customer_id_to_phone: dict  # customer_id -> phone_entries[normalized_phone]
+    zone_entries_phone: dict    # normalized_zone -> (tuple of entries)
+    # Name CSV
+    name_entries: dict          # normalized_name -> (tuple of entries)
+    customer_id_to_name: dict   # customer_id -> name_entries[normalized_name]
+    zone_entries_name: dict     # normalized_zone -> (tuple of entries)
+    # Raw rows
+    fraud_list_phone: list
+    fraud_list_name: list
+    # Cross-CSV joins used for contacts
+    cid_to_phone_entries: dict  # customer_id -> (phone entries containing it)
+    cid_to_name_entries: dict   # customer_id -> (name entries containing it)
+    # Searchable keys merged per query form (see build_lookups)
+    lookup_phone: dict          # normalized phone -> ("phone", tuple of entries)
+    lookup_raw: dict            # customer_id -> (kind, tuple of entries)
+    lookup_name: dict           # normalized name/zone -> (kind, tuple of entries)
+    name_phonetic: dict         # metaphone code -> (normalized names sharing it)
+    # Result row per entry (see build_location_entry). Keyed by id(entry) and owned by
+    # this snapshot: entries carried over into the next one get a fresh dict there,
+    # so building a new snapshot never touches what readers of this one see.
+    locations: dict             # id(entry) -> location dict
+    # Bumped on every rebuild; lets caches and ETags tell snapshots apart
+    generation: int
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            phone_entries={},
+            customer_id_to_phone={},
+            zone_entries_phone={},
+            name_entries={},
+            customer_id_to_name={},
+            zone_entries_name={},
+            fraud_list_phone=[],
+            fraud_list_name=[],
+            cid_to_phone_entries={},
+            cid_to_name_entries={},
+            lookup_phone={},
+            lookup_raw={},
+            lookup_name={},
+            name_phonetic={},
+            locations={},
+            generation=0,
+        )
+
+
+INDEXES = Indexes.empty()
+_generations = itertools.count(1)
+
+# Serializes refreshes (background thread vs /internal/refresh) so a slower writer can't
+# publish a snapshot built on top of a stale one. Readers never take it.
+refresh_lock = threading.Lock()
+
+# Serialized /api/search answers for the published snapshot:
+# (match, generation) -> (body, etag). At most one per searchable key; emptied on every publish.
+_api_bodies = {}
+
+# Long-lived worker for the second CSV download, reused across refreshes
+_FETCH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-fetch")
 
 
 def normalize_phone(phone):
     """
     Normalize phone to a canonical key (no leading 0).
+    - Separators (space, '-', '(', ')', '+') are dropped if what remains is all digits
     - If phone starts with '0' and length == 11 -> returns string without leading zero
     """
-    phone = str(phone).strip()
-    if phone.startswith('0') and len(phone) == 11:
+    if type(phone) is not str:
+        phone = str(phone)
+    # strip() hands back the same object when there is nothing to trim
+    phone = phone.strip()
+    if not phone.isdigit():
+        # Tolerate typed separators ("0171-234 5678", "(0171) 2345678"), but only when the
+        # rest is a number: names must keep their spaces.
+        digits = phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '').replace('+', '')
+        if digits.isdigit():
+            phone = digits
+    if len(phone) == 11 and phone[0] == '0':
         return phone[1:]
     return phone
 
@@ -49,44 +239,50 @@ def normalize_name(name):
     """Lowercase, strip and collapse whitespace."""
     if name is None:
         return ""
-    return " ".join(str(name).strip().split()).lower()
+    # split() with no argument already drops leading/trailing whitespace
+    return " ".join(str(name).split()).lower()
 
 
 def normalize_zone(zone):
     """Lowercase, strip and collapse whitespace."""
     if zone is None:
         return ""
-    return " ".join(str(zone).strip().split()).lower()
+    # split() with no argument already drops leading/trailing whitespace
+    return " ".join(str(zone).split()).lower()
+
+
+def phonetic_key(name):
+    """Metaphone code of a normalized name ("ahmed khan" and "ahmad khan" -> "AMT KHN")."""
+    return jellyfish.metaphone(name)
 
 
 def parse_customer_ids(cell):
-    # Remove brackets, replace commas/newlines with spaces, and split
-    if cell is None:
+    # Remove brackets, replace commas with spaces, and split.
+    # split() with no argument also breaks on newlines and never yields empty items.
+    # Cells come straight from csv.reader, so they are always str ('' when missing).
+    if not cell:
         return []
-    cell = str(cell).strip().strip("[]").replace('\n', ' ').replace(',', ' ')
-    return [cid for cid in cell.split() if cid]
+    # strip() first: it also trims Unicode whitespace (e.g. NBSP from pasted cells)
+    return cell.strip().strip("[]").replace(',', ' ').split()
 
 
-def fetch_and_parse_csv(url, mode="phone"):
+def parse_csv_rows(reader, mode="phone"):
     """
-    Fetch CSV and parse.
+    Build the indexes for one CSV from a csv.reader (header row first).
     mode = "phone" expects a 'Phone' column and builds phone-based indexes
     mode = "name" expects a name-like column (ReceiverFullName or Name) and builds name-based indexes
     Returns: (list_rows, grouped_entries, id_map, zone_map)
     """
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    lines = response.content.decode('utf-8').splitlines()
-    reader = csv.DictReader(lines)
     temp_list = []
     temp_group = {}
     temp_id_map = {}
     temp_zone_map = {}
 
+    headers = next(reader, None) or []
+
     # Try to detect name header for the "name" CSV
     name_header = None
     if mode == "name":
-        headers = reader.fieldnames or []
         for h in headers:
             if h and ("name" in h.lower() or "receiver" in h.lower()):
                 name_header = h
@@ -97,124 +293,396 @@ def fetch_and_parse_csv(url, mode="phone"):
             elif "Name" in headers:
                 name_header = "Name"
 
+    # Resolve column positions once. A missing column points one past the header,
+    # and every row is padded to that width, so it reads as '' like a short row does.
+    missing = len(headers)
+
+    def column(name):
+        return headers.index(name) if name in headers else missing
+
+    key_header = 'Phone' if mode == "phone" else name_header
+    columns = [column(key_header), column('State'), column('City'), column('Zone'), column('customer_ids')]
+    width = max(columns) + 1
+    fields = itemgetter(*columns)
+    Entry = PhoneEntry if mode == "phone" else NameEntry
+    normalize_key = normalize_phone if mode == "phone" else normalize_name
+
+    # Low-cardinality columns (state/city/zone) repeat across many rows; interning them
+    # makes every duplicate share one string object (less memory, identity-fast dict hits).
+    # Phone/name keys are high-cardinality and churn between refreshes, so they are
+    # deduplicated through a per-parse dict instead of the process-wide intern table
+    # (which never shrinks on Python 3.12).
+    intern = sys.intern
+    seen_keys = {}
+    dedup = seen_keys.setdefault
+
     for row in reader:
-        if mode == "phone":
-            phone_raw = row.get('Phone', '').strip()
-            phone_key = normalize_phone(phone_raw)
-            zone_raw = row.get('Zone', '').strip()
-            zone_key = normalize_zone(zone_raw)
-            ids = parse_customer_ids(row.get('customer_ids', ''))
-            entry = {
-                "phone_raw": phone_raw,
-                "phone_key": phone_key,
-                "state": row.get('State', '').strip(),
-                "city": row.get('City', '').strip(),
-                "zone": zone_raw,
-                "distinct_customers": row.get('distinct_customers', '').strip(),
-                "customer_ids": ids
-            }
-            temp_list.append(entry)
-            temp_group.setdefault(phone_key, []).append(entry)
-            if zone_key:
-                temp_zone_map.setdefault(zone_key, []).append(entry)
-            for cid in ids:
-                temp_id_map[cid] = phone_key
-
-        elif mode == "name":
-            if name_header:
-                name_val = row.get(name_header, '').strip()
-            else:
-                name_val = (row.get('ReceiverFullName', '') or row.get('Name', '') or '').strip()
-
-            name_key = normalize_name(name_val)
-            zone_raw = row.get('Zone', '').strip()
-            zone_key = normalize_zone(zone_raw)
-            ids = parse_customer_ids(row.get('customer_ids', ''))
-            entry = {
-                "name_raw": name_val,
-                "name_key": name_key,
-                "state": row.get('State', '').strip(),
-                "city": row.get('City', '').strip(),
-                "zone": zone_raw,
-                "distinct_customers": row.get('distinct_customers', '').strip(),
-                "customer_ids": ids
-            }
-            temp_list.append(entry)
-            temp_group.setdefault(name_key, []).append(entry)
-            if zone_key:
-                temp_zone_map.setdefault(zone_key, []).append(entry)
-            for cid in ids:
-                temp_id_map[cid] = name_key
+        if not row:
+            continue  # blank line
+        if len(row) < width:
+            row += [''] * (width - len(row))
+        key_raw, state, city, zone_raw, ids_cell = fields(row)
+
+        key_raw = key_raw.strip()
+        key = normalize_key(key_raw)
+        key = dedup(key, key)
+        zone_raw = intern(zone_raw.strip())
+        zone_key = intern(normalize_zone(zone_raw))
+        ids = parse_customer_ids(ids_cell)
+        entry = Entry(
+            key_raw,
+            key,
+            intern(state.strip()),
+            intern(city.strip()),
+            zone_raw,
+            ids,
+        )
+        temp_list.append(entry)
+        temp_group.setdefault(key, []).append(entry)
+        if zone_key:
+            temp_zone_map.setdefault(zone_key, []).append(entry)
+        for cid in ids:
+            temp_id_map[cid] = key
+
+    # Groups are never mutated after the build; tuples drop the list growth slack
+    temp_group = {k: tuple(v) for k, v in temp_group.items()}
+    temp_zone_map = {k: tuple(v) for k, v in temp_zone_map.items()}
+    # Point customer ids straight at their group so a lookup needs no second probe
+    temp_id_map = {cid: temp_group[key] for cid, key in temp_id_map.items()}
 
     return temp_list, temp_group, temp_id_map, temp_zone_map
 
 
+def fetch_and_parse_csv(url, mode="phone", session=SESSION):
+    """
+    Fetch CSV over `session` and parse (see parse_csv_rows for the modes).
+    Returns: (list_rows, grouped_entries, id_map, zone_map),
+             or None if the CSV is unchanged since the last fetch: either the server
+             answered 304, or it ignored the validators and resent an identical body
+    """
+    headers = {}
+    etag, last_modified, last_digest = _csv_validators.get(url, (None, None, None))
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    # The with-block always closes the streamed response, returning the connection to the pool
+    with session.get(url, headers=headers, timeout=(5, 30), stream=True) as response:
+        status = response.status_code
+        if status == 304:
+            return None
+        if status >= 400:
+            raise requests.HTTPError(f"HTTP {status} for url: {url}", response=response)
+        # Hand the csv module a real file object over the streamed body: it reads in its own
+        # buffered C loop and the body is never held in memory as a whole.
+        # iter_content gunzips and behaves the same on urllib3 1.26 and 2.x.
+        body = _HashingReader(response.iter_content(chunk_size=64 * 1024))
+        reader = csv.reader(io.TextIOWrapper(io.BufferedReader(body), encoding='utf-8', newline=''))
+        result = parse_csv_rows(reader, mode)
+
+    # Only remember validators once the whole body parsed successfully
+    digest = body.digest.digest()
+    _csv_validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"), digest)
+    if digest == last_digest:
+        return None
+    return result
+
+
+def build_location_entry(base_entry, contacts):
+    """
+    Clone the location fields and attach contacts list.
+    distinct_customers is the number of unique customer_ids in this row (precomputed at ingest).
+    """
+    distinct_count = base_entry.distinct_count
+    return {
+        "state": base_entry.state,
+        "city": base_entry.city,
+        "zone": base_entry.zone,
+        "distinct_customers": distinct_count,  # displayed
+        "distinct_count": distinct_count,      # kept for total calculation
+        "customer_ids": base_entry.customer_ids,
+        "contacts": contacts,
+    }
+
+
+def index_by_customer_id(entries):
+    """
+    Build customer_id -> (entries whose customer_ids contain it).
+    Pre-joins the two CSVs so contact lookup is one dict access per customer id.
+    """
+    index = {}
+    for e in entries:
+        for cid in e.customer_ids_set:
+            index.setdefault(cid, []).append(e)
+    return {cid: tuple(v) for cid, v in index.items()}
+
+
+def contacts_for_phone_entry(e, idx):
+    """
+    Contacts for a single row from the phone CSV:
+    - Always include its own phone number
+    - Add any names whose customer_ids intersect with this row's customer_ids
+    """
+    contacts = []
+    seen = set()
+
+    phone_val = (e.phone_raw or "").strip()
+    if phone_val:
+        contacts.append(phone_val)
+        seen.add(phone_val)
+
+    # via customer_id -> name entries sharing that id
+    for cid in e.customer_ids:
+        for ne in idx.cid_to_name_entries.get(cid, ()):
+            name_val = (ne.name_raw or "").strip()
+            if name_val and name_val not in seen:
+                contacts.append(name_val)
+                seen.add(name_val)
+
+    return contacts
+
+
+def contacts_for_name_entry(e, idx):
+    """
+    Contacts for a single row from the name CSV:
+    - Always include its own name
+    - Add any phone numbers whose customer_ids intersect with this row's customer_ids
+    """
+    contacts = []
+    seen = set()
+
+    name_val = (e.name_raw or "").strip()
+    if name_val:
+        contacts.append(name_val)
+        seen.add(name_val)
+
+    # via customer_id -> phone entries sharing that id
+    for cid in e.customer_ids:
+        for pe in idx.cid_to_phone_entries.get(cid, ()):
+            phone_val = (pe.phone_raw or "").strip()
+            if phone_val and phone_val not in seen:
+                contacts.append(phone_val)
+                seen.add(phone_val)
+
+    return contacts
+
+
+# Search priority of each match kind (lower wins), as listed in _cached_query_result
+_KIND_RANK = {"phone": 0, "cid_phone": 1, "name": 2, "cid_name": 3, "zone_phone": 4, "zone_name": 5}
+
+
+def build_lookups(phone_group, phone_id_map, name_group, name_id_map, phone_zone_map, name_zone_map):
+    """
+    Merge the query indexes into one dict per query form, so a search is at most
+    three probes instead of up to six misses across six tables:
+    - phone form (normalize_phone): phones
+    - raw query text: customer ids from either CSV
+    - name form (normalize_name, which zones share): names, then zones
+    Within a dict, sources are inserted in search-priority order and setdefault keeps
+    the first meaning of a key. Priority across dicts is settled at query time.
+    Returns: (lookup_phone, lookup_raw, lookup_name)
+    """
+    lookups = ({}, {}, {})
+    lookup_phone, lookup_raw, lookup_name = lookups
+    for lookup, kind, mapping in (
+        (lookup_phone, "phone", phone_group),
+        (lookup_raw, "cid_phone", phone_id_map),
+        (lookup_name, "name", name_group),
+        (lookup_raw, "cid_name", name_id_map),
+        (lookup_name, "zone_phone", phone_zone_map),
+        (lookup_name, "zone_name", name_zone_map),
+    ):
+        for key, value in mapping.items():
+            if key:
+                lookup.setdefault(key, (kind, value))
+    return lookups
+
+
+def build_phonetic_index(name_group):
+    """
+    Bucket normalized names by phonetic code so a misspelled query only has to be
+    compared against the handful of names that sound alike, not the whole list.
+    """
+    index = {}
+    for name_key in name_group:
+        code = phonetic_key(name_key)
+        if code:
+            index.setdefault(code, []).append(name_key)
+    return {code: tuple(keys) for code, keys in index.items()}
+
+
+def find_similar_name(idx, norm_name):
+    """
+    Fuzzy fallback for typos/transliteration variants of a name: take the names that
+    share the query's phonetic code and return the closest spelling, provided it is
+    within roughly one edit per four characters (so "ahmad khan" finds "ahmed khan",
+    and "reena das" finds "rina das", but a bare "reena" is two edits from "rina" and
+    does not). Queries under four characters never fall back: at that length one edit
+    reaches unrelated short names. Returns a name key or None.
+    """
+    if len(norm_name) < 4:
+        return None
+    candidates = idx.name_phonetic.get(phonetic_key(norm_name))
+    if not candidates:
+        return None
+    best_key, best_distance = None, max(1, len(norm_name) // 4) + 1
+    for name_key in candidates:
+        distance = jellyfish.levenshtein_distance(norm_name, name_key)
+        if distance < best_distance:
+            best_key, best_distance = name_key, distance
+    return best_key
+
+
+def build_indexes(phone_list, phone_group, phone_id_map, phone_zone_map,
+                  name_list, name_group, name_id_map, name_zone_map, previous=None):
+    """
+    Assemble a complete Indexes snapshot from the parsed rows of both CSVs,
+    including the cross-CSV joins and per-entry contacts.
+    A side carried over unchanged from `previous` reuses its per-side indexes.
+    """
+    if previous is not None and phone_list is previous.fraud_list_phone:
+        cid_to_phone_entries = previous.cid_to_phone_entries
+    else:
+        cid_to_phone_entries = index_by_customer_id(phone_list)
+    if previous is not None and name_list is previous.fraud_list_name:
+        cid_to_name_entries = previous.cid_to_name_entries
+        name_phonetic = previous.name_phonetic
+    else:
+        cid_to_name_entries = index_by_customer_id(name_list)
+        name_phonetic = build_phonetic_index(name_group)
+
+    lookup_phone, lookup_raw, lookup_name = build_lookups(
+        phone_group, phone_id_map, name_group, name_id_map, phone_zone_map, name_zone_map
+    )
+
+    new_indexes = Indexes(
+        phone_entries=phone_group,
+        customer_id_to_phone=phone_id_map,
+        zone_entries_phone=phone_zone_map,
+        name_entries=name_group,
+        customer_id_to_name=name_id_map,
+        zone_entries_name=name_zone_map,
+        fraud_list_phone=phone_list,
+        fraud_list_name=name_list,
+        cid_to_phone_entries=cid_to_phone_entries,
+        cid_to_name_entries=cid_to_name_entries,
+        lookup_phone=lookup_phone,
+        lookup_raw=lookup_raw,
+        lookup_name=lookup_name,
+        name_phonetic=name_phonetic,
+        locations={},
+        generation=next(_generations),
+    )
+    # A row's location (including contacts) depends only on the indexes, so build it once
+    # here rather than per query. Entries carried over from the previous snapshot get theirs
+    # rebuilt too, since the other CSV may have changed. Only the new, unpublished snapshot's
+    # own dict is filled; the entry objects themselves are never written to.
+    locations = new_indexes.locations
+    for e in phone_list:
+        locations[id(e)] = build_location_entry(e, contacts_for_phone_entry(e, new_indexes))
+    for e in name_list:
+        locations[id(e)] = build_location_entry(e, contacts_for_name_entry(e, new_indexes))
+    return new_indexes
+
+
 def fetch_and_parse_all():
     """
     Fetch both CSVs and build in-memory indexes.
+    The new snapshot is built entirely on the side while readers keep using the
+    current one. If a CSV fails to load, that side carries over from the current
+    snapshot instead of being emptied; the same applies when the CSV is unchanged
+    (304 Not Modified, or a byte-identical body).
+    Concurrent refreshes run one at a time; searches are never blocked.
+    Returns (phone_status, name_status), each "updated", "unchanged" or "failed";
+    raises if both CSVs failed to load.
     """
-    phone_list, phone_group, phone_id_map, phone_zone_map = [], {}, {}, {}
-    name_list, name_group, name_id_map, name_zone_map = [], {}, {}, {}
+    with refresh_lock:
+        return _refresh_indexes()
+
+
+def _refresh_indexes():
+    """Body of fetch_and_parse_all; caller must hold refresh_lock."""
+    global INDEXES
+    current = INDEXES
+    phone_list, phone_group, phone_id_map, phone_zone_map = (
+        current.fraud_list_phone, current.phone_entries, current.customer_id_to_phone, current.zone_entries_phone
+    )
+    name_list, name_group, name_id_map, name_zone_map = (
+        current.fraud_list_name, current.name_entries, current.customer_id_to_name, current.zone_entries_name
+    )
+
+    # The two CSVs are independent: the name CSV downloads on the fetch worker
+    # while this thread handles the phone CSV
+    name_future = _FETCH_POOL.submit(fetch_and_parse_csv, CSV_URL_NAME, mode="name")
 
     # Phone CSV
+    phone_result = None
     try:
-        phone_list, phone_group, phone_id_map, phone_zone_map = fetch_and_parse_csv(CSV_URL_PHONE, mode="phone")
+        phone_result = fetch_and_parse_csv(CSV_URL_PHONE, mode="phone")
+        phone_status = "unchanged" if phone_result is None else "updated"
     except Exception as e:
-        print(f"Error fetching phone CSV: {e}")
+        phone_status = "failed"
+        print(f"Error fetching phone CSV (keeping previous data): {e}")
+    if phone_result is not None:
+        phone_list, phone_group, phone_id_map, phone_zone_map = phone_result
 
     # Name CSV
+    name_result = None
     try:
-        name_list, name_group, name_id_map, name_zone_map = fetch_and_parse_csv(CSV_URL_NAME, mode="name")
+        name_result = name_future.result()
+        name_status = "unchanged" if name_result is None else "updated"
     except Exception as e:
-        print(f"Error fetching name CSV: {e}")
-
-    with data_lock:
-        fraud_list_phone.clear()
-        fraud_list_phone.extend(phone_list)
-        phone_entries.clear()
-        phone_entries.update(phone_group)
-        customer_id_to_phone.clear()
-        customer_id_to_phone.update(phone_id_map)
-        zone_entries_phone.clear()
-        zone_entries_phone.update(phone_zone_map)
-
-        fraud_list_name.clear()
-        fraud_list_name.extend(name_list)
-        name_entries.clear()
-        name_entries.update(name_group)
-        customer_id_to_name.clear()
-        customer_id_to_name.update(name_id_map)
-        zone_entries_name.clear()
-        zone_entries_name.update(name_zone_map)
+        name_status = "failed"
+        print(f"Error fetching name CSV (keeping previous data): {e}")
+    if name_result is not None:
+        name_list, name_group, name_id_map, name_zone_map = name_result
+
+    if phone_status == "failed" and name_status == "failed":
+        raise RuntimeError("both CSV fetches failed; keeping previous data")
+
+    # Nothing new on either side: keep serving the current snapshot as-is
+    if phone_result is None and name_result is None:
+        print(f"Indexes not rebuilt (phone CSV {phone_status}, name CSV {name_status}).")
+        return phone_status, name_status
+
+    try:
+        new_indexes = build_indexes(
+            phone_list, phone_group, phone_id_map, phone_zone_map,
+            name_list, name_group, name_id_map, name_zone_map,
+            previous=current,
+        )
+    except Exception:
+        # Nothing was published: forget the validators so the next refresh re-downloads
+        # instead of getting a 304 for data we never indexed.
+        _csv_validators.clear()
+        raise
+
+    # Publish with a single global rebind (atomic under the GIL): readers see
+    # either the old snapshot or the new one, never a half-built mix.
+    INDEXES = new_indexes
+    # Answers cached for the previous snapshot would only keep its data alive
+    _cached_query_result.cache_clear()
+    _api_bodies.clear()
 
     print(
         f"Loaded phone rows={len(phone_list)} phone_keys={len(phone_group)} phone_zones={len(phone_zone_map)} | "
         f"name rows={len(name_list)} name_keys={len(name_group)} name_zones={len(name_zone_map)}"
     )
+    return phone_status, name_status
 
 
 def sync_csv_background():
     while True:
         try:
-            fetch_and_parse_all()
-            print("CSVs refreshed.")
+            phone_status, name_status = fetch_and_parse_all()
+            print(f"CSV refresh done (phone {phone_status}, name {name_status}).")
         except Exception as e:
             print(f"CSV fetch error: {e}")
         # sleep 600 seconds = 10 minutes
         time.sleep(600)
 
 
-# Start background sync thread unless disabled by env var.
-if os.getenv("DISABLE_BACKGROUND_SYNC") != "1":
-    sync_thread = threading.Thread(target=sync_csv_background, daemon=True)
-    sync_thread.start()
-else:
-    try:
-        fetch_and_parse_all()
-    except Exception as e:
-        print(f"Initial CSV fetch failed: {e}")
-
-
 # -------------------------------
 # Template
 # -------------------------------
@@ -486,92 +954,10 @@ TEMPLATE = """<!DOCTYPE html>
 </html>
 """
 
-
-# -------------------------------
-# Query helpers
-# -------------------------------
-
-def build_location_entry(base_entry, contacts):
-    """
-    Clone the location fields and attach contacts list.
-    distinct_customers is computed from the number of unique customer_ids in this row.
-    """
-    ids = list(base_entry.get("customer_ids", []))
-    distinct_count = len(set(ids))
-    return {
-        "state": base_entry["state"],
-        "city": base_entry["city"],
-        "zone": base_entry["zone"],
-        "distinct_customers": distinct_count,  # displayed
-        "distinct_count": distinct_count,      # kept for total calculation
-        "customer_ids": ids,
-        "contacts": contacts,
-    }
-
-
-def contacts_for_phone_entry(e):
-    """
-    Contacts for a single row from the phone CSV:
-    - Always include its own phone number
-    - Add any names whose customer_ids intersect with this row's customer_ids
-    """
-    contacts = []
-    seen = set()
-
-    phone_val = (e.get("phone_raw") or "").strip()
-    if phone_val:
-        contacts.append(phone_val)
-        seen.add(phone_val)
-
-    ids = set(e.get("customer_ids", []))
-    if not ids:
-        return contacts
-
-    # via customer_id -> name_key -> name_entries[name_key]
-    for cid in ids:
-        name_key = customer_id_to_name.get(cid)
-        if not name_key:
-            continue
-        for ne in name_entries.get(name_key, []):
-            if cid in ne.get("customer_ids", []):
-                name_val = (ne.get("name_raw") or "").strip()
-                if name_val and name_val not in seen:
-                    contacts.append(name_val)
-                    seen.add(name_val)
-
-    return contacts
-
-
-def contacts_for_name_entry(e):
-    """
-    Contacts for a single row from the name CSV:
-    - Always include its own name
-    - Add any phone numbers whose customer_ids intersect with this row's customer_ids
-    """
-    contacts = []
-    seen = set()
-
-    name_val = (e.get("name_raw") or "").strip()
-    if name_val:
-        contacts.append(name_val)
-        seen.add(name_val)
-
-    ids = set(e.get("customer_ids", []))
-    if not ids:
-        return contacts
-
-    for cid in ids:
-        phone_key = customer_id_to_phone.get(cid)
-        if not phone_key:
-            continue
-        for pe in phone_entries.get(phone_key, []):
-            if cid in pe.get("customer_ids", []):
-                phone_val = (pe.get("phone_raw") or "").strip()
-                if phone_val and phone_val not in seen:
-                    contacts.append(phone_val)
-                    seen.add(phone_val)
-
-    return contacts
+# Compile once at import; render_template_string would re-hash and look up the source on every request
+_TEMPLATE = app.jinja_env.from_string(TEMPLATE)
+# The landing page has no per-request data, so render it just once as well
+_INDEX_HTML = _TEMPLATE.render(result=None)
 
 
 # -------------------------------
@@ -580,7 +966,7 @@ def contacts_for_name_entry(e):
 
 @app.route("/", methods=["GET"])
 def index():
-    return render_template_string(TEMPLATE, result=None)
+    return _INDEX_HTML
 
 
 def _finalize_result_with_total(result_dict):
@@ -606,6 +992,27 @@ def _finalize_result_with_total(result_dict):
 
 
 def get_query_result(query):
+    """
+    Look up a query against the current indexes. Answers are memoized per refresh
+    generation; the caller gets its own top-level dict so it can add keys freely.
+    """
+    result, search_display, _ = _query_result(query.strip(), INDEXES.generation)
+    return dict(result), search_display
+
+
+def _query_result(q, generation):
+    """
+    _cached_query_result, but queries longer than any real phone, id, name or zone are
+    looked up without being memoized: the LRU keeps its keys alive, so caching arbitrary
+    text would let callers pin up to 4096 request bodies.
+    """
+    if len(q) > 64:
+        return _cached_query_result.__wrapped__(q, generation)
+    return _cached_query_result(q, generation)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_query_result(q, generation):
     """
     Search order:
     1) Try as phone (normalized) in phone_entries           -> per-row contacts
@@ -614,135 +1021,155 @@ def get_query_result(query):
     4) Try as customer_id in customer_id_to_name            -> per-row contacts
     5) Try as zone (normalized) in zone_entries_phone       -> per-row contacts
     6) Try as zone (normalized) in zone_entries_name        -> per-row contacts
+    7) Try a similar-sounding name in name_entries           -> per-row contacts
+    Each query form probes its own merged dict (see build_lookups) and the
+    highest-priority hit among the three wins, so the order above holds even when
+    one key means different things in different forms.
+    Returns (result, search_display, match), where match is the resolved (kind, key)
+    or None when nothing matched.
+    `generation` is only part of the cache key: a refresh bumps it and clears the cache,
+    so an answer still being computed for older indexes is never hit again.
     """
-    q = query.strip()
     search_display = q
     result = {"status": "notfraud", "locations": [], "match_type": None, "total_distinct_ids": None, "final_status": "notfraud"}
 
-    norm_phone = normalize_phone(q)
-    norm_name = normalize_name(q)
-    norm_zone = normalize_zone(q)
-
-    with data_lock:
-        # 1. phone direct match
-        if norm_phone and norm_phone in phone_entries:
-            entries = phone_entries[norm_phone]
-            locations = []
-            for e in entries:
-                contacts = contacts_for_phone_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            display_phone = q
-            if len(norm_phone) == 10:
-                display_phone = '0' + norm_phone
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "phone (phone CSV)",
-                "phone": display_phone
-            }
-            _finalize_result_with_total(result)
-            search_display = display_phone
-            return result, search_display
-
-        # 2. customer id -> phone
-        if q in customer_id_to_phone:
-            phone_key = customer_id_to_phone[q]
-            entries = phone_entries.get(phone_key, [])
-            locations = []
-            for e in entries:
-                contacts = contacts_for_phone_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            display_phone = phone_key
-            if len(phone_key) == 10:
-                display_phone = '0' + phone_key
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "customer_id -> phone (phone CSV)",
-                "phone": display_phone
-            }
-            _finalize_result_with_total(result)
-            search_display = q
-            return result, search_display
-
-        # 3. name direct match (normalized)
-        if norm_name and norm_name in name_entries:
-            entries = name_entries[norm_name]
-            locations = []
-            for e in entries:
-                contacts = contacts_for_name_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            display_name = entries[0].get("name_raw", q)
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "name (name CSV)",
-                "name": display_name
-            }
-            _finalize_result_with_total(result)
-            search_display = display_name
-            return result, search_display
-
-        # 4. customer id -> name
-        if q in customer_id_to_name:
-            name_key = customer_id_to_name[q]
-            entries = name_entries.get(name_key, [])
-            locations = []
-            for e in entries:
-                contacts = contacts_for_name_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            display_name = entries[0].get("name_raw", q) if entries else q
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "customer_id -> name (name CSV)",
-                "name": display_name
-            }
-            _finalize_result_with_total(result)
-            search_display = display_name
-            return result, search_display
-
-        # 5. zone match in phone CSV (contacts per-row)
-        if norm_zone and norm_zone in zone_entries_phone:
-            entries = zone_entries_phone[norm_zone]
-            locations = []
-            for e in entries:
-                contacts = contacts_for_phone_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            zone_name = entries[0].get("zone", q)
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "zone (phone CSV)",
-                "zone": zone_name
-            }
-            _finalize_result_with_total(result)
-            search_display = zone_name
-            return result, search_display
-
-        # 6. zone match in name CSV (contacts per-row)
-        if norm_zone and norm_zone in zone_entries_name:
-            entries = zone_entries_name[norm_zone]
-            locations = []
-            for e in entries:
-                contacts = contacts_for_name_entry(e)
-                locations.append(build_location_entry(e, contacts))
-            zone_name = entries[0].get("zone", q)
-            result = {
-                "status": "fraud",
-                "locations": locations,
-                "match_type": "zone (name CSV)",
-                "zone": zone_name
-            }
-            _finalize_result_with_total(result)
-            search_display = zone_name
-            return result, search_display
+    # Only compute the forms that can differ from q itself (zones normalize like names)
+    if q.isdigit():
+        # Plain digits have no case or inner whitespace: the name form is q
+        norm_phone = normalize_phone(q)
+        norm_name = q
+    else:
+        first = q[:1]
+        if first.isdigit() or first in ("+", "(", ")", "-"):
+            norm_phone = normalize_phone(q)
+        else:
+            # Not phone-shaped: normalize_phone would hand back q unchanged
+            norm_phone = q
+        norm_name = normalize_name(q)
+
+    # Take one snapshot so every lookup below sees the same refresh generation.
+    idx = INDEXES
+
+    key, kind, value = None, None, None
+    for lookup, candidate in ((idx.lookup_phone, norm_phone), (idx.lookup_raw, q), (idx.lookup_name, norm_name)):
+        if candidate:
+            hit = lookup.get(candidate)
+            if hit is not None and (kind is None or _KIND_RANK[hit[0]] < _KIND_RANK[kind]):
+                key = candidate
+                kind, value = hit
+
+    # Nothing matched exactly: fall back to a name that sounds alike
+    if kind is None and norm_name:
+        similar_key = find_similar_name(idx, norm_name)
+        if similar_key is not None:
+            key, kind, value = similar_key, "similar_name", idx.name_entries[similar_key]
+
+    # 1. phone direct match
+    if kind == "phone":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        # Taken from the row, not the query, so every spelling of a number gets the same answer
+        display_phone = entries[0].phone_raw
+        if len(key) == 10:
+            display_phone = '0' + key
+        result = {
+            "status": "fraud",
+            "locations": locations,
+            "match_type": "phone (phone CSV)",
+            "phone": display_phone
+        }
+        _finalize_result_with_total(result)
+        search_display = display_phone
+        return result, search_display, (kind, key)
+
+    # 2. customer id -> phone
+    if kind == "cid_phone":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        # Show the number as the CSV has it: the key may have lost '+' or separators
+        display_phone = entries[0].phone_raw
+        if len(display_phone) == 10:
+            display_phone = '0' + display_phone
+        result = {
+            "status": "fraud",
+            "locations": locations,
+            "match_type": "customer_id -> phone (phone CSV)",
+            "phone": display_phone
+        }
+        _finalize_result_with_total(result)
+        search_display = key
+        return result, search_display, (kind, key)
+
+    # 3. name direct match (normalized), or the phonetic fallback (checked last)
+    if kind == "name" or kind == "similar_name":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        display_name = entries[0].name_raw
+        result = {
+            # "fraud" means the query itself is on the list; a name that only sounds
+            # alike belongs to someone else, so it gets its own status
+            "status": "fraud" if kind == "name" else "similar",
+            "locations": locations,
+            "match_type": "name (name CSV)" if kind == "name" else "similar name (name CSV)",
+            "name": display_name
+        }
+        _finalize_result_with_total(result)
+        # A name that only sounds alike is a lead, not a verdict: never show it as fraud
+        if kind == "similar_name" and result["final_status"] == "fraud":
+            result["final_status"] = "potential"
+        search_display = display_name
+        return result, search_display, (kind, key)
+
+    # 4. customer id -> name
+    if kind == "cid_name":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        display_name = entries[0].name_raw if entries else q
+        result = {
+            "status": "fraud",
+            "locations": locations,
+            "match_type": "customer_id -> name (name CSV)",
+            "name": display_name
+        }
+        _finalize_result_with_total(result)
+        search_display = display_name
+        return result, search_display, (kind, key)
+
+    # 5. zone match in phone CSV (contacts per-row)
+    if kind == "zone_phone":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        zone_name = entries[0].zone
+        result = {
+            "status": "fraud",
+            "locations": locations,
+            "match_type": "zone (phone CSV)",
+            "zone": zone_name
+        }
+        _finalize_result_with_total(result)
+        search_display = zone_name
+        return result, search_display, (kind, key)
+
+    # 6. zone match in name CSV (contacts per-row)
+    if kind == "zone_name":
+        entries = value
+        locations = [idx.locations[id(e)] for e in entries]
+        zone_name = entries[0].zone
+        result = {
+            "status": "fraud",
+            "locations": locations,
+            "match_type": "zone (name CSV)",
+            "zone": zone_name
+        }
+        _finalize_result_with_total(result)
+        search_display = zone_name
+        return result, search_display, (kind, key)
 
     # not found
     if len(q) == 10:
         search_display = '0' + q
     result = {"status": "notfraud", "locations": [], "match_type": None, "total_distinct_ids": None, "final_status": "notfraud"}
-    return result, search_display
+    return result, search_display, None
 
 
 @app.route("/search", methods=["GET", "POST"])
@@ -751,16 +1178,50 @@ def search():
         return redirect(url_for("index"))
     query = request.form["query"].strip()
     result, search_display = get_query_result(query)
-    return render_template_string(TEMPLATE, result=result, search_value=search_display)
+    return _TEMPLATE.render(result=result, search_value=search_display)
 
 
-# JSON API endpoint for programmatic use
-@app.route("/api/search", methods=["POST"])
+# JSON API endpoint for programmatic use.
+# GET ?query=... is accepted alongside POST so browsers/CDNs can actually cache the answer.
+@app.route("/api/search", methods=["GET", "POST"])
 def api_search():
-    query = request.form.get("query", "").strip()
-    result, search_display = get_query_result(query)
-    result["search_value"] = search_display
-    return jsonify(result)
+    query = request.values.get("query", "").strip()
+    body, etag = _api_search_body(query)
+    # Compress() tags encoded bodies "<etag>:br" / "<etag>:gzip"; those revalidate too.
+    # If-None-Match compares weakly: proxies that re-encode often send back W/"...".
+    for tag in (etag, f"{etag}:br", f"{etag}:gzip"):
+        if request.if_none_match.contains_weak(tag):
+            response = app.response_class(status=304)
+            response.set_etag(tag)
+            return response
+
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+
+def _api_search_body(query):
+    """
+    Serialized /api/search payload and its ETag.
+    Bodies are cached by what the query resolved to, not by its text: every hit's
+    payload (search_value included) depends only on the matched entries, so spelling
+    variants of one phone, zone or name share a single copy. Misses echo the query
+    back, are cheap to build and are not cached.
+    The ETag hashes the bytes themselves, so it holds across refreshes that leave this
+    answer alone and agrees between server instances.
+    """
+    generation = INDEXES.generation
+    result, search_display, match = _query_result(query, generation)
+    cache_key = (match, generation)
+    cached = _api_bodies.get(cache_key)
+    if cached is None:
+        payload = dict(result)
+        payload["search_value"] = search_display
+        body = orjson.dumps(payload)
+        cached = body, hashlib.blake2b(body, digest_size=8).hexdigest()
+        if match is not None:
+            _api_bodies[cache_key] = cached
+    return cached
 
 
 # Secure internal refresh endpoint for cron jobs and manual triggering
@@ -787,20 +1248,38 @@ def internal_refresh():
             return jsonify({"ok": False, "error": "unauthorized"}), 401
 
     try:
-        fetch_and_parse_all()
-        return jsonify({"ok": True, "message": "refreshed"})
+        phone_status, name_status = fetch_and_parse_all()
+        return jsonify({"ok": True, "message": "refreshed", "phone": phone_status, "name": name_status})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
 @app.after_request
 def add_header(response):
+    if request.endpoint == "api_search" and response.status_code in (200, 304):
+        # Indexes only change every ~10 minutes: let clients/edges reuse answers briefly
+        # and revalidate in the background (cheap 304s via the ETag above).
+        response.headers["Cache-Control"] = "public, max-age=30, stale-while-revalidate=600"
+        return response
+    # HTML pages and errors stay uncached so the form never shows stale state
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
     return response
 
 
+# Start background sync thread unless disabled by env var.
+# Kept after the routes: a refresh clears the query caches defined above.
+if os.getenv("DISABLE_BACKGROUND_SYNC") != "1":
+    sync_thread = threading.Thread(target=sync_csv_background, daemon=True)
+    sync_thread.start()
+else:
+    try:
+        fetch_and_parse_all()
+    except Exception as e:
+        print(f"Initial CSV fetch failed: {e}")
+
+
 if __name__ == "__main__":
     # local dev: perform initial load and run dev server
     try: